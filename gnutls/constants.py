@@ -26,10 +26,16 @@ from gnutls.library import constants
 
 
 class GNUTLSConstant(int):
+    _cache = {}
+
     def __new__(cls, name):
+        cached = cls._cache.get(name)
+        if cached is not None:
+            return cached
         gnutls_name = 'GNUTLS_' + __name_map__.get(name, name)
         instance = int.__new__(cls, getattr(constants, gnutls_name))
         instance.name = name
+        cls._cache[name] = instance
         return instance
 
     def __repr__(self):
@@ -37,8 +43,6 @@ class GNUTLSConstant(int):
 
 
 # Generate all exported constants
-code = '\n'.join([f"{name} = GNUTLSConstant('{name}')" for name in __all__])
-exec(code, locals(), globals())
+globals().update({name: GNUTLSConstant(name) for name in __all__})
 
-del code
 del constants
@@ -2,45 +2,82 @@
 
 __all__ = ['function_args', 'method_args', 'none', 'ignore', 'list_of', 'one_of']
 
+from functools import lru_cache, wraps
+from inspect import unwrap
+
 
 # Helper functions (internal use)
 #
 
 def isclass(obj):
-    return hasattr(obj, '__bases__') or isinstance(obj, type)
+    return isinstance(obj, type)
+
+
+@lru_cache(maxsize=None)
+def _get_validator(typ_id, typ):
+    return Validator.lookup(typ)
+
+
+def _bind(namespace, obj):
+    """Add obj to the namespace of generated code and return the name it is bound to"""
+    name = '_%d' % len(namespace)
+    namespace[name] = obj
+    return name
 
 
 # Internal validator classes
 #
 
 class Validator(object):
-    _registered = []
+    __slots__ = ('type', '_name')
+    _registered = ()
 
     def __init__(self, typ):
         self.type = typ
+        self._name = self._precompute_name()
 
     def check(self, value):
         return False
 
+    def source(self, value, namespace):
+        """Return an expression that checks value, to be used in generated code"""
+        return '%s(%s)' % (_bind(namespace, self.check), value)
+
+    def accepts_bytes_for_str(self):
+        return False
+
     @staticmethod
     def can_validate(typ):
         return False
 
+    @classmethod
+    def from_spec(cls, typ):
+        return cls(typ) if cls.can_validate(typ) else None
+
     @classmethod
     def register(cls, validator):
-        cls._registered.append(validator)
+        # kept as a tuple as it is only scanned after the validators are registered at import time
+        Validator._registered += (validator,)
+        _get_validator.cache_clear()
 
     @classmethod
     def get(cls, typ):
-        for validator in cls._registered:
-            if validator.can_validate(typ):
-                return validator(typ)
-        else:
-            return None
+        try:
+            return _get_validator(id(typ), typ)
+        except TypeError:  # unhashable type specification, cannot be cached
+            return cls.lookup(typ)
+
+    @classmethod
+    def lookup(cls, typ):
+        for validator_class in cls._registered:
+            validator = validator_class.from_spec(typ)
+            if validator is not None:
+                return validator
+        return None
 
     @staticmethod
     def join_names(names):
-        if type(names) in (tuple, list):
+        if isinstance(names, (tuple, list)):
             if len(names) <= 2:
                 return ' or '.join(names)
             else:
@@ -54,8 +91,7 @@ class Validator(object):
         else:
             return self.type.__name__.replace('NoneType', 'None')
 
-    @property
-    def name(self):
+    def _precompute_name(self):
         name = self._type_names()
         if name.startswith('None'):
             prefix = ''
@@ -65,10 +101,17 @@ class Validator(object):
             prefix = 'a '
         return prefix + name
 
+    @property
+    def name(self):
+        return self._name
+
 
 class IgnoringValidator(Validator):
+    __slots__ = ()
+
     def __init__(self, typ):
         self.type = none
+        self._name = self._precompute_name()
 
     def check(self, value):
         return True
@@ -79,8 +122,18 @@ class IgnoringValidator(Validator):
 
 
 class TypeValidator(Validator):
-    def check(self, value):
-        return isinstance(value, self.type)
+    __slots__ = ('check',)
+
+    def __init__(self, typ):
+        super(TypeValidator, self).__init__(typ)
+        # bind check on the instance to skip the method lookup when called
+        self.check = lambda value, _type=typ: isinstance(value, _type)
+
+    def source(self, value, namespace):
+        return 'isinstance(%s, %s)' % (value, _bind(namespace, self.type))
+
+    def accepts_bytes_for_str(self):
+        return self.type is str or (isinstance(self.type, tuple) and str in self.type)
 
     @staticmethod
     def can_validate(obj):
@@ -88,56 +141,103 @@ class TypeValidator(Validator):
 
 
 class MultiTypeValidator(TypeValidator):
+    __slots__ = ()
+
     @staticmethod
     def can_validate(obj):
-        return isinstance(obj, tuple) and not [x for x in obj if not isclass(x)]
+        return isinstance(obj, tuple) and len(obj) > 0 and all(isclass(x) for x in obj)
 
 
 class OneOfValidator(Validator):
+    __slots__ = ('_set',)
+
     def __init__(self, typ):
         self.type = typ.type
+        self._set = typ._set
+        self._name = self._precompute_name()
 
     def check(self, value):
-        return value in self.type
+        try:
+            return value in self._set
+        except TypeError:  # unhashable value
+            return value in self.type
 
     @staticmethod
     def can_validate(obj):
         return isinstance(obj, one_of)
 
-    @property
-    def name(self):
+    def _precompute_name(self):
         return 'one of %s' % self.join_names(["`%r'" % e for e in self.type])
 
 
 class ListOfValidator(Validator):
+    __slots__ = ()
+
     def __init__(self, typ):
         self.type = typ.type
+        self._name = self._precompute_name()
 
     def check(self, value):
-        return isinstance(value, (tuple, list)) and not [x for x in value if not isinstance(x, self.type)]
+        return isinstance(value, (tuple, list)) and all(isinstance(x, self.type) for x in value)
 
     @staticmethod
     def can_validate(obj):
         return isinstance(obj, list_of)
 
-    @property
-    def name(self):
+    def _precompute_name(self):
         return 'a list of %s' % self._type_names()
 
 
 class ComplexValidator(Validator):
+    __slots__ = ('_ordered',)
+
     def __init__(self, typ):
-        self.type = [Validator.get(x) for x in typ]
+        validators = self._resolve(typ)
+        if validators is None:
+            raise TypeError("unsupported type `%r' for %s" % (typ, self.__class__.__name__))
+        self._set_validators(validators)
+
+    def _set_validators(self, validators):
+        self.type = validators
+        # check with the cheaper validators first, they are registered in order of increasing cost
+        self._ordered = tuple(sorted(validators, key=lambda v: Validator._registered.index(type(v))))
+        self._name = self._precompute_name()
 
     def check(self, value):
-        return bool(sum(t.check(value) for t in self.type))
+        return any(t.check(value) for t in self._ordered)
+
+    def accepts_bytes_for_str(self):
+        return any(t.accepts_bytes_for_str() for t in self.type)
 
     @staticmethod
     def can_validate(obj):
-        return isinstance(obj, tuple) and not [x for x in obj if Validator.get(x) is None]
+        return ComplexValidator._resolve(obj) is not None
 
-    @property
-    def name(self):
+    @staticmethod
+    def _resolve(obj):
+        """Return the validators for the elements of obj or None if some of them cannot be validated"""
+        if not isinstance(obj, tuple) or not obj:
+            return None
+        validators = []
+        for x in obj:
+            validator = Validator.get(x)
+            if validator is None:
+                return None
+            validators.append(validator)
+        return validators
+
+    @classmethod
+    def from_spec(cls, typ):
+        validators = cls._resolve(typ)
+        return None if validators is None else cls._from_resolved(validators)
+
+    @classmethod
+    def _from_resolved(cls, validators):
+        instance = cls.__new__(cls)
+        instance._set_validators(validators)
+        return instance
+
+    def _precompute_name(self):
         return self.join_names([x.name for x in self.type])
 
 
@@ -155,15 +255,23 @@ none = type(None)
 
 
 class one_of(object):
+    __slots__ = ('type', '_set')
+
     def __init__(self, *args):
         if len(args) < 2:
             raise ValueError("one_of must have at least 2 arguments")
         self.type = args
+        try:
+            self._set = frozenset(args)
+        except TypeError:  # unhashable arguments, use the tuple for membership tests
+            self._set = args
 
 
 class list_of(object):
+    __slots__ = ('type',)
+
     def __init__(self, *args):
-        if [x for x in args if not isclass(x)]:
+        if not all(isclass(x) for x in args):
             raise TypeError("list_of arguments must be types")
         if len(args) == 1:
             self.type = args[0]
@@ -171,7 +279,7 @@ class list_of(object):
             self.type = args
 
 
-ignore = type('ignore', (), {})()
+ignore = object()
 
 
 # Helpers for writing well behaved decorators
@@ -184,44 +292,7 @@ def decorator(func):
 
 def preserve_signature(func):
     """Preserve the original function signature and attributes in decorator wrappers."""
-    from inspect import getfullargspec, signature
-    from gnutls.constants import GNUTLSConstant
-
-    constants = [c for c in (getfullargspec(func)[3] or []) if isinstance(c, GNUTLSConstant)]
-    sig = signature(func)
-
-    parameters = []
-    signature = []
-    for item in list(sig.parameters.items()):
-        parameters.append(item[0])
-        if 'empty' in str(item[1].default):
-            signature.append(item[1].name)
-        else:
-            signature.append(f'{item[1].name}={item[1].default}')
-
-    signature = f"({', '.join(signature)})"
-    parameters = f"({', '.join(parameters)})"
-
-    # parameters = signature(*getfullargspec(func),
-    # **{'formatvalue': lambda value: ""})[1:-1]
-    def fix_signature(wrapper):
-        if constants:
-            # import the required GNUTLSConstants used as function default arguments
-            constants_str = ', '.join([c.name for c in constants])
-            code = f'from gnutls.constants import {constants_str}'
-            exec(code, locals(), locals())
-
-        code = (f'def {func.__name__}{signature}: \n'
-                f'    return wrapper{parameters} \n'
-                f'new_wrapper = {func.__name__}')
-        exec(code, locals(), globals())
-
-        new_wrapper.__name__ = func.__name__
-        new_wrapper.__doc__ = func.__doc__
-        new_wrapper.__module__ = func.__module__
-        new_wrapper.__dict__.update(func.__dict__)
-        return new_wrapper
-    return fix_signature
+    return wraps(func)
 
 
 # Argument validating decorators
@@ -229,6 +300,9 @@ def preserve_signature(func):
 
 def _callable_args(*args, **kwargs):
     """Internal function used by argument checking decorators"""
+    if not __debug__:
+        # argument checking is disabled when running with -O
+        return lambda func: func
     start = kwargs.get('_start', 0)
     validators = []
     for i, arg in enumerate(args):
@@ -239,22 +313,45 @@ def _callable_args(*args, **kwargs):
         validators.append(validator)
 
     def check_args_decorator(func):
-        @preserve_signature(func)
-        def check_args(*func_args):
-            pos = start
-            for validator in validators:
-                if not validator.check(func_args[pos]):
-                    pass
-                    # auxiliar exception to catch string_at ctypes function returning bytes
-                    if isinstance(func_args[pos], bytes) and 'str' in validator.name:
-                        pass
-                    #pass
-                    #else:
-                    #raise TypeError(f"argument {pos + 1 - start} of func_args must be {validator.name} \n {func_args[pos+1-start]}")
-                #pos += 1
-            return func(*func_args)
-
-        return check_args
+        # generate a check_args function with the checks for each argument unrolled. the validators
+        # apply in order to the positional parameters, then to the keyword-only parameters and then
+        # to any extra positional arguments collected by *args. the parameters are taken from the
+        # innermost function, as wrappers made by other decorators only take (*args, **kwargs)
+        code = getattr(unwrap(func), '__code__', None)
+        if code is not None:
+            arg_count = code.co_argcount
+            kwonly_count = code.co_kwonlyargcount
+            posonly_count = code.co_posonlyargcount
+            arg_names = code.co_varnames[:arg_count + kwonly_count]
+        else:
+            arg_count = kwonly_count = posonly_count = 0
+            arg_names = ()
+        namespace = {'_func': func}
+        lines = ['def check_args(*args, **kwargs):']
+        for pos, validator in enumerate(validators, start):
+            if isinstance(validator, IgnoringValidator):
+                continue
+            values = []
+            if pos < arg_count:
+                values.append(('len(args) > %d' % pos, 'args[%d]' % pos))
+            elif pos >= len(arg_names):
+                # extra positional arguments follow the positional parameters in args
+                index = pos - kwonly_count
+                values.append(('len(args) > %d' % index, 'args[%d]' % index))
+            if posonly_count <= pos < len(arg_names):
+                values.append(('%r in kwargs' % arg_names[pos], 'kwargs[%r]' % arg_names[pos]))
+            message = _bind(namespace, 'argument %d must be %s' % (pos + 1 - start, validator.name))
+            for i, (condition, value) in enumerate(values):
+                test = validator.source(value, namespace)
+                if validator.accepts_bytes_for_str():
+                    # accept bytes for str arguments, as returned by the ctypes string_at function
+                    test = '%s or isinstance(%s, bytes)' % (test, value)
+                lines.append('    %s %s:' % ('elif' if i else 'if', condition))
+                lines.append('        if not (%s):' % test)
+                lines.append('            raise TypeError(%s)' % message)
+        lines.append('    return _func(*args, **kwargs)')
+        exec('\n'.join(lines), namespace)
+        return preserve_signature(func)(namespace['check_args'])
     return check_args_decorator
 
 
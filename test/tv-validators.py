@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+# Exercise the argument validating decorators. Run without -O, as the
+# decorators are disabled when optimizations are on.
+
+import os
+import sys
+
+from functools import wraps
+
+script_path = os.path.realpath(os.path.dirname(sys.argv[0]))
+gnutls_path = os.path.realpath(os.path.join(script_path, '..'))
+sys.path[0:0] = [gnutls_path]
+
+from gnutls.constants import SHUT_RDWR, SHUT_WR
+from gnutls.validators import function_args, method_args, none, ignore, list_of, one_of
+
+
+@function_args(int, (str, none), one_of(SHUT_RDWR, SHUT_WR), list_of(int), ignore)
+def function(a, b=None, c=SHUT_RDWR, d=(), e=None):
+    return a, b, c, d, e
+
+
+@function_args(int, int)
+def keyword_only(a, *, b):
+    return a, b
+
+
+@function_args(int, str, int)
+def variable_args(a, *args):
+    return a, args
+
+
+@function_args(int, str, float)
+def variable_and_keyword_only(a, *args, b):
+    return a, args, b
+
+
+def passthrough(func):
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        return func(*args, **kwargs)
+    return wrapper
+
+
+@function_args(int)
+@passthrough
+def wrapped(a):
+    return a
+
+
+@function_args(int, str)
+def positional_only(a, /, **kwargs):
+    return a, kwargs
+
+
+class Object(object):
+    @method_args((int, one_of('low', 'high')))
+    def method(self, level=0):
+        return level
+
+
+failures = 0
+
+
+def accepts(description, call):
+    global failures
+    try:
+        call()
+    except TypeError as e:
+        print('FAIL: %s: %s' % (description, e))
+        failures += 1
+    else:
+        print('ok:   %s' % description)
+
+
+def rejects(description, call, message):
+    global failures
+    try:
+        call()
+    except TypeError as e:
+        if str(e) == message:
+            print('ok:   %s' % description)
+        else:
+            print('FAIL: %s: %r != %r' % (description, str(e), message))
+            failures += 1
+    else:
+        print('FAIL: %s: no TypeError raised' % description)
+        failures += 1
+
+
+if __debug__:
+    accepts('positional arguments', lambda: function(1, 'x', SHUT_WR, [1, 2], object()))
+    accepts('default arguments', lambda: function(1))
+    accepts('keyword arguments', lambda: function(a=1, b=None, c=SHUT_WR, d=(3,)))
+    accepts('bytes for str', lambda: function(1, b'x'))
+    accepts('ignored argument', lambda: function(1, e=[]))
+    accepts('keyword-only argument', lambda: keyword_only(1, b=2))
+    accepts('extra positional arguments', lambda: variable_args(1, 'x', 2))
+    accepts('extra positional and keyword-only arguments', lambda: variable_and_keyword_only(1, 2.0, b='x'))
+    accepts('wrapped function keyword argument', lambda: wrapped(a=1))
+    accepts('positional-only name in kwargs', lambda: positional_only(1, a=2))
+    accepts('complex argument', lambda: Object().method('high'))
+    accepts('complex keyword argument', lambda: Object().method(level=3))
+
+    rejects('positional type', lambda: function('x'), 'argument 1 must be an int')
+    rejects('keyword type', lambda: function(a='x'), 'argument 1 must be an int')
+    rejects('multiple types', lambda: function(1, 2), 'argument 2 must be a str or None')
+    rejects('one_of', lambda: function(1, None, 7), "argument 3 must be one of `SHUT_RDWR' or `SHUT_WR'")
+    rejects('one_of with unhashable value', lambda: function(1, None, []), "argument 3 must be one of `SHUT_RDWR' or `SHUT_WR'")
+    rejects('list_of', lambda: function(1, None, SHUT_WR, [1, 'x']), 'argument 4 must be a list of int')
+    rejects('list_of with bytes', lambda: function(1, None, SHUT_WR, b'x'), 'argument 4 must be a list of int')
+    rejects('keyword-only type', lambda: keyword_only(1, b='x'), 'argument 2 must be an int')
+    rejects('extra positional type', lambda: variable_args(1, 'x', 'y'), 'argument 3 must be an int')
+    rejects('extra positional with keyword-only type', lambda: variable_and_keyword_only(1, 'x', b='x'), 'argument 3 must be a float')
+    rejects('keyword-only with extra positional type', lambda: variable_and_keyword_only(1, 2.0, b=1), 'argument 2 must be a str')
+    rejects('wrapped function keyword type', lambda: wrapped(a='x'), 'argument 1 must be an int')
+    rejects('positional-only type', lambda: positional_only(None), 'argument 1 must be an int')
+    rejects('complex', lambda: Object().method('medium'), "argument 1 must be an int or one of `'low'' or `'high''")
+    rejects('empty specification', lambda: function_args(()), "unsupported type `()' at position 1 for argument checking decorator")
+else:
+    print('argument validation is disabled with -O')
+
+sys.exit(1 if failures else 0)